@@ -5,77 +5,103 @@ Results analysis script for benchmark suite.
 Parses k6 JSON output and container metrics to generate comprehensive reports.
 """
 
+import array
+import csv
 import json
 import os
 import sys
 import glob
 from pathlib import Path
 from collections import defaultdict
-import statistics
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import numpy as np
+
+# Prefer orjson for the per-line k6 parse; fall back to the stdlib parser
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    json_loads = json.loads
+    JSONDecodeError = json.JSONDecodeError
 
 def parse_k6_json(file_path):
     """Parse k6 JSON output and extract key metrics."""
     metrics = {
         'http_reqs': [],
-        'http_req_duration': [],
+        'http_req_duration': array.array('d'),  # packed doubles, not float objects
         'http_req_failed': [],
         'vus': [],
         'iterations': 0
     }
 
+    # Bind hot-loop lookups once; this loop runs for every line of output
+    duration_append = metrics['http_req_duration'].append
+    reqs_append = metrics['http_reqs'].append
+    vus_append = metrics['vus'].append
+    iterations = 0
+
     try:
-        with open(file_path, 'r') as f:
+        with open(file_path, 'rb') as f:
             for line in f:
                 try:
-                    data = json.loads(line.strip())
-
-                    if data.get('type') == 'Point':
-                        metric_name = data.get('metric')
-                        value = data.get('data', {}).get('value')
-
-                        if metric_name == 'http_req_duration' and value:
-                            metrics['http_req_duration'].append(value)
-                        elif metric_name == 'http_reqs' and value:
-                            metrics['http_reqs'].append(value)
-                        elif metric_name == 'vus' and value:
-                            metrics['vus'].append(value)
-                        elif metric_name == 'iterations' and value:
-                            metrics['iterations'] += value
-
-                except json.JSONDecodeError:
+                    data = json_loads(line)
+                except JSONDecodeError:
+                    continue
+
+                if data.get('type') != 'Point':
                     continue
 
+                value = data.get('data', {}).get('value')
+                if not value:
+                    continue
+
+                metric_name = data.get('metric')
+                if metric_name == 'http_req_duration':
+                    duration_append(value)
+                elif metric_name == 'http_reqs':
+                    reqs_append(value)
+                elif metric_name == 'vus':
+                    vus_append(value)
+                elif metric_name == 'iterations':
+                    iterations += value
+
     except FileNotFoundError:
         print(f"Warning: File not found: {file_path}")
         return None
 
+    metrics['iterations'] = iterations
     return metrics
 
-def calculate_percentile(data, percentile):
-    """Calculate percentile from data."""
-    if not data:
-        return 0
-    sorted_data = sorted(data)
-    index = int(len(sorted_data) * percentile / 100)
-    return sorted_data[min(index, len(sorted_data) - 1)]
+def calculate_percentiles(data, percentiles):
+    """Calculate several percentiles from data with a single partial sort."""
+    if len(data) == 0:
+        return [0] * len(percentiles)
+    data = np.asarray(data, dtype=np.float64)
+    indices = (len(data) * np.asarray(percentiles) / 100).astype(int)
+    indices = np.minimum(indices, len(data) - 1)
+    # Quickselect only the requested ranks instead of ordering everything
+    return np.partition(data, indices)[indices].tolist()
 
 def analyze_metrics(metrics):
     """Calculate summary statistics from metrics."""
     if not metrics or not metrics.get('http_req_duration'):
         return None
 
-    durations = metrics['http_req_duration']
+    # Zero-copy view over the packed array built by parse_k6_json
+    durations = np.frombuffer(metrics['http_req_duration'], dtype=np.float64)
+    p90, p95, p99 = calculate_percentiles(durations, [90, 95, 99])
 
     summary = {
         'total_requests': len(durations),
-        'mean_duration_ms': statistics.mean(durations) if durations else 0,
-        'median_duration_ms': statistics.median(durations) if durations else 0,
-        'p90_ms': calculate_percentile(durations, 90),
-        'p95_ms': calculate_percentile(durations, 95),
-        'p99_ms': calculate_percentile(durations, 99),
-        'min_ms': min(durations) if durations else 0,
-        'max_ms': max(durations) if durations else 0,
+        'mean_duration_ms': float(durations.mean()),
+        'median_duration_ms': float(np.median(durations)),
+        'p90_ms': p90,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'min_ms': float(durations.min()),
+        'max_ms': float(durations.max()),
         'iterations': metrics.get('iterations', 0)
     }
 
@@ -93,10 +119,11 @@ def parse_container_stats(file_path):
 def generate_markdown_report(results, output_path):
     """Generate a markdown report from results."""
 
-    report = []
-    report.append("# Benchmark Results Report\n")
-    report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    report.append("\n---\n\n")
+    sections = [
+        "# Benchmark Results Report\n"
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        "\n---\n\n"
+    ]
 
     # Group by level
     levels = ['level1_hello', 'level2_normal', 'level3_cpu', 'level4_strings']
@@ -108,36 +135,29 @@ def generate_markdown_report(results, output_path):
     }
 
     for level in levels:
-        report.append(f"## {level_names.get(level, level)}\n\n")
-
-        # Create comparison table
-        report.append("| Service | Requests | Mean (ms) | Median (ms) | P95 (ms) | P99 (ms) | Max (ms) |\n")
-        report.append("|---------|----------|-----------|-------------|----------|----------|----------|\n")
-
         level_results = {k: v for k, v in results.items() if level in k}
 
-        for service_key in sorted(level_results.keys()):
-            summary = level_results[service_key]
-            service_name = service_key.split('_')[0].upper()
-
-            report.append(
-                f"| {service_name:7} | "
-                f"{summary['total_requests']:8} | "
-                f"{summary['mean_duration_ms']:9.2f} | "
-                f"{summary['median_duration_ms']:11.2f} | "
-                f"{summary['p95_ms']:8.2f} | "
-                f"{summary['p99_ms']:8.2f} | "
-                f"{summary['max_ms']:8.2f} |\n"
-            )
-
-        report.append("\n")
+        # Create comparison table
+        rows = "".join(
+            f"| {service_key.split('_')[0].upper():7} | "
+            f"{summary['total_requests']:8} | "
+            f"{summary['mean_duration_ms']:9.2f} | "
+            f"{summary['median_duration_ms']:11.2f} | "
+            f"{summary['p95_ms']:8.2f} | "
+            f"{summary['p99_ms']:8.2f} | "
+            f"{summary['max_ms']:8.2f} |\n"
+            for service_key, summary in sorted(level_results.items())
+        )
+
+        sections.append(
+            f"## {level_names.get(level, level)}\n\n"
+            "| Service | Requests | Mean (ms) | Median (ms) | P95 (ms) | P99 (ms) | Max (ms) |\n"
+            "|---------|----------|-----------|-------------|----------|----------|----------|\n"
+            f"{rows}\n"
+        )
 
     # Performance comparison summary
-    report.append("\n## Performance Summary\n\n")
-    report.append("### Requests Per Second (Approximate)\n\n")
-    report.append("| Service | Level 1 | Level 2 | Level 3 | Level 4 |\n")
-    report.append("|---------|---------|---------|---------|----------|\n")
-
+    rows = []
     services = ['python', 'php', 'go', 'cpp']
     for service in services:
         row = [service.upper()]
@@ -148,17 +168,25 @@ def generate_markdown_report(results, output_path):
                 row.append(f"{rps:.0f}")
             else:
                 row.append("N/A")
-        report.append(f"| {' | '.join(row)} |\n")
+        rows.append(f"| {' | '.join(row)} |\n")
 
-    report.append("\n")
+    sections.append(
+        "\n## Performance Summary\n\n"
+        "### Requests Per Second (Approximate)\n\n"
+        "| Service | Level 1 | Level 2 | Level 3 | Level 4 |\n"
+        "|---------|---------|---------|---------|----------|\n"
+        f"{''.join(rows)}\n"
+    )
 
     # Memory comparison (if available)
-    report.append("## Resource Usage\n\n")
-    report.append("*Memory and CPU metrics to be collected from container stats*\n\n")
+    sections.append(
+        "## Resource Usage\n\n"
+        "*Memory and CPU metrics to be collected from container stats*\n\n"
+    )
 
     # Write report
     with open(output_path, 'w') as f:
-        f.writelines(report)
+        f.write("".join(sections))
 
     print(f"Report generated: {output_path}")
 
@@ -179,7 +207,8 @@ def main():
     # Find all JSON result files
     json_files = glob.glob(os.path.join(raw_dir, "*.json"))
 
-    results = {}
+    # Collect the files to parse along with their result keys
+    jobs = []
 
     for json_file in json_files:
         filename = os.path.basename(json_file)
@@ -197,12 +226,17 @@ def main():
                 level = '_'.join(parts[1:-1])  # level tests, everything except service and run_id
 
             print(f"Processing: {service} - {level}")
+            jobs.append((json_file, f"{service}_{level}"))
+
+    results = {}
 
-            metrics = parse_k6_json(json_file)
+    # Parsing is CPU-bound, so spread the files across processes
+    with ProcessPoolExecutor() as executor:
+        all_metrics = executor.map(parse_k6_json, [json_file for json_file, _ in jobs])
+        for (_, key), metrics in zip(jobs, all_metrics):
             if metrics:
                 summary = analyze_metrics(metrics)
                 if summary:
-                    key = f"{service}_{level}"
                     results[key] = summary
 
     if not results:
@@ -215,19 +249,20 @@ def main():
 
     # Generate CSV for easy import
     csv_path = os.path.join(results_dir, "summary.csv")
-    with open(csv_path, 'w') as f:
-        f.write("Service,Level,Total_Requests,Mean_ms,Median_ms,P95_ms,P99_ms,Max_ms\n")
-        for key, summary in sorted(results.items()):
-            service, level = key.split('_', 1)
-            f.write(
-                f"{service},{level},"
-                f"{summary['total_requests']},"
-                f"{summary['mean_duration_ms']:.2f},"
-                f"{summary['median_duration_ms']:.2f},"
-                f"{summary['p95_ms']:.2f},"
-                f"{summary['p99_ms']:.2f},"
-                f"{summary['max_ms']:.2f}\n"
-            )
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['Service', 'Level', 'Total_Requests', 'Mean_ms',
+                         'Median_ms', 'P95_ms', 'P99_ms', 'Max_ms'])
+        writer.writerows(
+            [*key.split('_', 1),
+             summary['total_requests'],
+             f"{summary['mean_duration_ms']:.2f}",
+             f"{summary['median_duration_ms']:.2f}",
+             f"{summary['p95_ms']:.2f}",
+             f"{summary['p99_ms']:.2f}",
+             f"{summary['max_ms']:.2f}"]
+            for key, summary in sorted(results.items())
+        )
 
     print(f"CSV summary generated: {csv_path}")
     print("\nAnalysis complete!")
@@ -5,14 +5,36 @@ Visualization script for benchmark results.
 Generates comprehensive charts and graphs comparing language performance.
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 import sys
 from pathlib import Path
+
+import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Render straight to files, no GUI backend
+import matplotlib.pyplot as plt
+import seaborn as sns
 import numpy as np
 
+# Output resolution; set BENCHY_DPI=300 for publication-quality renders
+DEFAULT_DPI = 150
+
+def get_dpi():
+    """Read the output DPI from BENCHY_DPI, falling back to the default."""
+    value = os.environ.get('BENCHY_DPI', '')
+    if not value:
+        return DEFAULT_DPI
+    try:
+        dpi = int(value)
+    except ValueError:
+        dpi = 0
+    if dpi <= 0:
+        print(f"Warning: Invalid BENCHY_DPI={value!r}, using {DEFAULT_DPI}")
+        return DEFAULT_DPI
+    return dpi
+
+DPI = get_dpi()
+
 # Set style
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 8)
@@ -30,20 +52,28 @@ def load_summary_data(results_dir):
     df = pd.read_csv(csv_path)
     return df
 
+def calculate_rps(df):
+    """Approximate RPS per service (rows) and level (columns), 0 where missing."""
+    rps = 1000.0 / df.pivot(index='Service', columns='Level', values='Mean_ms')
+    return rps.reindex(index=df['Service'].unique(), columns=df['Level'].unique()).fillna(0)
+
 def plot_latency_comparison(df, output_dir):
     """Create latency comparison charts for each level."""
-    levels = df['Level'].unique()
     level_names = {
         'level1_hello': 'Level 1: Hello World',
         'level2_normal': 'Level 2: Normal Work',
         'level3_cpu': 'Level 3: CPU-Intensive',
         'level4_strings': 'Level 4: String Processing'
     }
+    rps_pivot = calculate_rps(df)
 
-    for level in levels:
-        level_data = df[df['Level'] == level]
+    # Figure setup is costly; build the grid once and clear it for each level
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
 
-        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    # One grouping pass instead of a boolean mask per level
+    for level, level_data in df.groupby('Level', sort=False):
+        for ax in axes.flat:
+            ax.clear()
         fig.suptitle(f'{level_names.get(level, level)} - Latency Analysis', fontsize=16, fontweight='bold')
 
         # 1. Mean latency comparison
@@ -89,7 +119,7 @@ def plot_latency_comparison(df, output_dir):
 
         # 4. Requests per second (approximate)
         ax4 = axes[1, 1]
-        rps = 1000 / level_data['Mean_ms']
+        rps = rps_pivot.loc[services, level].values
         bars = ax4.bar(services, rps, color=['#3498db', '#e74c3c', '#2ecc71', '#f39c12'])
         ax4.set_ylabel('Requests/Second')
         ax4.set_title('Throughput (Approx. RPS)')
@@ -104,14 +134,15 @@ def plot_latency_comparison(df, output_dir):
 
         plt.tight_layout()
         output_file = os.path.join(output_dir, f'{level}_latency_comparison.png')
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        plt.close()
+        plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
         print(f"Created: {output_file}")
 
+    plt.close(fig)
+
 def plot_throughput_comparison(df, output_dir):
     """Create throughput comparison across all levels."""
-    levels = df['Level'].unique()
-    services = df['Service'].unique()
+    rps_pivot = calculate_rps(df)
+    levels = rps_pivot.columns
 
     fig, ax = plt.subplots(figsize=(14, 8))
 
@@ -120,17 +151,8 @@ def plot_throughput_comparison(df, output_dir):
 
     colors = {'python': '#3498db', 'php': '#e74c3c', 'go': '#2ecc71', 'cpp': '#f39c12'}
 
-    for i, service in enumerate(services):
-        service_data = df[df['Service'] == service]
-        rps = []
-        for level in levels:
-            level_row = service_data[service_data['Level'] == level]
-            if not level_row.empty:
-                rps.append(1000 / level_row['Mean_ms'].values[0])
-            else:
-                rps.append(0)
-
-        ax.bar(x + i * width, rps, width, label=service.upper(), color=colors.get(service, '#95a5a6'))
+    for i, (service, rps) in enumerate(rps_pivot.iterrows()):
+        ax.bar(x + i * width, rps.values, width, label=service.upper(), color=colors.get(service, '#95a5a6'))
 
     ax.set_ylabel('Requests/Second', fontsize=12)
     ax.set_xlabel('Test Level', fontsize=12)
@@ -152,24 +174,23 @@ def plot_throughput_comparison(df, output_dir):
 
     plt.tight_layout()
     output_file = os.path.join(output_dir, 'throughput_comparison_all_levels.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
     plt.close()
     print(f"Created: {output_file}")
 
 def plot_performance_multipliers(df, output_dir):
     """Calculate and visualize performance multipliers."""
-    levels = df['Level'].unique()
+    rps_pivot = calculate_rps(df)
 
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
     fig.suptitle('Performance Multipliers (Relative to Slowest)', fontsize=16, fontweight='bold')
 
-    for idx, level in enumerate(levels):
+    for idx, (level, level_data) in enumerate(df.groupby('Level', sort=False)):
         ax = axes[idx // 2, idx % 2]
-        level_data = df[df['Level'] == level]
 
         # Calculate RPS for each service
         services = level_data['Service'].values
-        rps = 1000 / level_data['Mean_ms'].values
+        rps = rps_pivot.loc[services, level].values
 
         # Calculate multipliers relative to slowest
         min_rps = rps.min()
@@ -189,18 +210,20 @@ def plot_performance_multipliers(df, output_dir):
 
     plt.tight_layout()
     output_file = os.path.join(output_dir, 'performance_multipliers.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
     plt.close()
     print(f"Created: {output_file}")
 
 
 def plot_radar_chart(df, output_dir):
     """Create radar chart for multi-dimensional comparison."""
-    levels = df['Level'].unique()
-    services = df['Service'].unique()
+    rps_pivot = calculate_rps(df)
 
-    # Normalize metrics for radar chart (inverse for latency - lower is better)
-    categories = levels
+    # Normalize metrics for radar chart (inverse for latency - lower is better),
+    # scaling each service to 0-100 against its own best level
+    max_rps = rps_pivot.max(axis=1).replace(0, 1)
+    normalized = rps_pivot.div(max_rps, axis=0) * 100
+    categories = normalized.columns
 
     fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(projection='polar'))
 
@@ -209,22 +232,8 @@ def plot_radar_chart(df, output_dir):
 
     colors = {'python': '#3498db', 'php': '#e74c3c', 'go': '#2ecc71', 'cpp': '#f39c12'}
 
-    for service in services:
-        service_data = df[df['Service'] == service]
-        values = []
-
-        for level in categories:
-            level_row = service_data[service_data['Level'] == level]
-            if not level_row.empty:
-                # Use inverse of mean latency, normalized
-                rps = 1000 / level_row['Mean_ms'].values[0]
-                values.append(rps)
-            else:
-                values.append(0)
-
-        # Normalize values to 0-100 scale
-        max_val = max(values) if max(values) > 0 else 1
-        values = [v / max_val * 100 for v in values]
+    for service, row in normalized.iterrows():
+        values = row.tolist()
         values += values[:1]  # Complete the circle
 
         ax.plot(angles, values, 'o-', linewidth=2, label=service.upper(), color=colors.get(service, '#95a5a6'))
@@ -239,7 +248,7 @@ def plot_radar_chart(df, output_dir):
 
     plt.tight_layout()
     output_file = os.path.join(output_dir, 'performance_radar.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
     plt.close()
     print(f"Created: {output_file}")
 
@@ -277,7 +286,7 @@ def plot_latency_heatmap(df, output_dir):
 
     plt.tight_layout()
     output_file = os.path.join(output_dir, 'latency_heatmap.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
     plt.close()
     print(f"Created: {output_file}")
 
@@ -339,12 +348,11 @@ def plot_container_metrics(results_dir, output_dir):
 
     plt.tight_layout()
     output_file = os.path.join(output_dir, 'memory_usage_timeline.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.close()
+    plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
     print(f"Created: {output_file}")
 
-    # 2. CPU Usage Over Time
-    fig, ax = plt.subplots(figsize=(14, 6))
+    # 2. CPU Usage Over Time (same layout, so reuse the figure)
+    ax.clear()
 
     for service, df in metrics_data.items():
         ax.plot(df['elapsed_sec'], df['cpu_percent'],
@@ -359,7 +367,7 @@ def plot_container_metrics(results_dir, output_dir):
 
     plt.tight_layout()
     output_file = os.path.join(output_dir, 'cpu_usage_timeline.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
     plt.close()
     print(f"Created: {output_file}")
 
@@ -399,7 +407,7 @@ def plot_container_metrics(results_dir, output_dir):
     plt.suptitle('Container Memory Analysis (OS-Level)', fontsize=16, fontweight='bold', y=1.02)
     plt.tight_layout()
     output_file = os.path.join(output_dir, 'memory_statistics.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
     plt.close()
     print(f"Created: {output_file}")
 
@@ -427,7 +435,7 @@ def plot_container_metrics(results_dir, output_dir):
     plt.suptitle('Container CPU Analysis (OS-Level)', fontsize=16, fontweight='bold', y=1.02)
     plt.tight_layout()
     output_file = os.path.join(output_dir, 'cpu_statistics.png')
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=DPI, bbox_inches='tight')
     plt.close()
     print(f"Created: {output_file}")
 